@@ -12,18 +12,39 @@ simulate data generation in chunks.
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 import random
-import json
+import orjson
 import os
+import pickle
+import functools
+import hashlib
+import queue
+import shutil
+import threading
 import argparse
 import time
 import warnings
+from bisect import bisect_left
 from typing import Dict, List, Any
-from math import cos, pi, exp
 
 # Using ProcessPoolExecutor for parallel processing
 from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Numba is optional: without it each chunk is generated, degraded and clipped
+# in separate NumPy passes instead of one fused kernel.
+try:
+    from numba import njit, prange, set_num_threads
+    from numba import config as numba_config
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
@@ -43,6 +64,14 @@ def log_end(function_name, start_time):
     print(f"[{datetime.now()}] END: {function_name}, duration: {duration:.4f} s")
     return duration
 
+# Creates the random generator used to simulate one chunk.
+def make_rng(seed=None):
+    """
+    Returns a numpy Generator on the SFC64 bit generator, which is faster than the
+    legacy np.random.seed/MT19937 state and than PCG64 for bulk normal draws.
+    """
+    return np.random.Generator(np.random.SFC64(seed))
+
 # Appends a comment with a timestamp to a file.
 def add_comment_to_file(comment, file_path="save.txt"):
     """
@@ -62,7 +91,8 @@ def add_comment_to_file(comment, file_path="save.txt"):
 def generate_parameters(num_parameters=200,
                         desired_parameters=None,
                         variation_ranges=None,
-                        decimal_places=4):
+                        decimal_places=4,
+                        seed=None):
     """
     Generates a specified number of parameters (or more if needed),
     including the desired parameters (desired_parameters). Each parameter has:
@@ -70,6 +100,7 @@ def generate_parameters(num_parameters=200,
       - variation_prc (fraction of base used as std for noise),
       - unit (a simple string representing the unit of measurement).
     variation_ranges – list of possible (min, max) ranges for variation_prc.
+    seed – optional seed making the generated parameters reproducible.
     """
     start = log_start("generate_parameters",
                       num_parameters=num_parameters,
@@ -261,96 +292,251 @@ def generate_parameters(num_parameters=200,
             'Dynamic_Laser_Control'
         ]
 
-    parameters = {}
-    category_counter = {cat: 1 for cat in categories}
-
-    # Add desired parameters first.
-    for dp in desired_parameters:
-        if dp not in parameters:
-            c = random.choice(categories)
-            base_val = round(random.uniform(10, 1000), decimal_places)
-            chosen_range = random.choice(variation_ranges)
-            var_prc = round(random.uniform(chosen_range[0], chosen_range[1]), decimal_places)
-            parameters[dp] = {
-                "default": base_val,
-                "variation_prc": var_prc,
-                "unit": "units"
-            }
-
-    # Fill in the remaining parameters until reaching the target count.
-    while len(parameters) < num_parameters:
-        c = random.choice(categories)
-        param_name = f"{c}_param_{category_counter[c]}"
-        category_counter[c] += 1
-
-        if param_name in parameters:
-            continue
-
-        base_val = round(random.uniform(10, 1000), decimal_places)
-        chosen_range = random.choice(variation_ranges)
-        var_prc = round(random.uniform(chosen_range[0], chosen_range[1]), decimal_places)
-        parameters[param_name] = {
-            "default": base_val,
-            "variation_prc": var_prc,
+    rng = make_rng(seed)
+
+    # Desired parameters first.
+    names = list(dict.fromkeys(desired_parameters))
+    taken = set(names)
+
+    # Fill in the remaining parameters until reaching the target count. Categories are
+    # drawn in bulk and each drawn category gets the next number of its own counter.
+    counters = np.zeros(len(categories), dtype=np.int64)
+    while len(names) < num_parameters:
+        need = num_parameters - len(names)
+        cat_idx = rng.integers(0, len(categories), size=need)
+        # Rank of every draw among the earlier draws of the same category.
+        order = np.argsort(cat_idx, kind='stable')
+        sorted_idx = cat_idx[order]
+        rank = np.empty(need, dtype=np.int64)
+        rank[order] = np.arange(need) - np.searchsorted(sorted_idx, sorted_idx)
+        numbers = counters[cat_idx] + rank + 1
+        counters += np.bincount(cat_idx, minlength=len(categories))
+
+        for c, k in zip(cat_idx.tolist(), numbers.tolist()):
+            param_name = f"{categories[c]}_param_{k}"
+            if param_name not in taken:
+                taken.add(param_name)
+                names.append(param_name)
+
+    # Base values and variation percentages for all parameters at once.
+    n = len(names)
+    ranges   = np.asarray(variation_ranges, dtype=np.float64)
+    chosen   = ranges[rng.integers(0, len(ranges), size=n)]
+    base_val = np.round(rng.uniform(10, 1000, size=n), decimal_places)
+    var_prc  = np.round(rng.uniform(chosen[:, 0], chosen[:, 1]), decimal_places)
+
+    parameters = {
+        name: {
+            "default": b,
+            "variation_prc": v,
             "unit": "units"
         }
+        for name, b, v in zip(names, base_val.tolist(), var_prc.tolist())
+    }
 
     log_end("generate_parameters", start)
     return parameters
 
+# Per-user cache directory of the parameter and config caches. The caches are
+# pickles, so they live in a directory only the user can write to, never next to
+# the input files or in the working directory.
+def user_cache_dir():
+    base = (os.environ.get('XDG_CACHE_HOME')
+            or os.environ.get('LOCALAPPDATA')
+            or os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'euv_log_simulator')
+
+# Directory of the cached generated parameter sets.
+PARAM_CACHE_DIR = os.path.join(user_cache_dir(), 'params')
+
+# Version of the way generate_parameters draws the values; part of the cache key.
+# Bump it on any change there, so that older cached parameter sets are not reused.
+PARAM_CACHE_VERSION = 1
+
+# Generates parameters like generate_parameters, reusing a pickled copy for a given seed.
+def generate_parameters_cached(num_parameters=200,
+                               desired_parameters=None,
+                               variation_ranges=None,
+                               decimal_places=4,
+                               seed=None,
+                               cache_dir=PARAM_CACHE_DIR):
+    """
+    With a seed the result is deterministic, so it is pickled to
+    <cache_dir>/<sha1 of the arguments and PARAM_CACHE_VERSION>.pkl and loaded from
+    there on later calls.
+    Without a seed the parameters are random on every call and nothing is cached.
+    """
+    if seed is None:
+        return generate_parameters(num_parameters, desired_parameters, variation_ranges,
+                                   decimal_places)
+
+    key = hashlib.sha1(repr((PARAM_CACHE_VERSION,
+                             num_parameters,
+                             list(desired_parameters or []),
+                             [tuple(r) for r in variation_ranges or []],
+                             decimal_places,
+                             seed)).encode()).hexdigest()[:12]
+    cache_file = os.path.join(cache_dir, f"{key}.pkl")
+    try:
+        with open(cache_file, 'rb') as f:
+            params = pickle.load(f)
+        print(f"[{datetime.now()}] Parameters loaded from {cache_file}")
+        return params
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+        pass
+
+    params = generate_parameters(num_parameters, desired_parameters, variation_ranges,
+                                 decimal_places, seed=seed)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump(params, f, protocol=5)
+    except OSError as e:
+        print(f"[{datetime.now()}] Parameter cache not written: {e}")
+    return params
+
 # Saves the configuration with parameters to a JSON file.
 def save_parameters_to_json(parameters, config, filename='laser_parameters.json'):
     start = log_start("save_parameters_to_json", filename=filename)
-    with open(filename, 'w') as f:
-        json.dump(config, f, indent=4, default=str)
+    # orjson serializes datetime and NumPy values natively.
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     print(f"[{datetime.now()}] Parameters saved to {filename}")
     log_end("save_parameters_to_json", start)
 
 # Loads the configuration from a JSON file.
 def load_parameters(config_file='laser_parameters.json'):
     start = log_start("load_parameters", config_file=config_file)
-    with open(config_file, 'r', encoding='utf-8-sig') as f:
-        config = json.load(f)
+    with open(config_file, 'rb') as f:
+        data = f.read()
+    # Files saved by some editors start with a UTF-8 BOM, which orjson rejects.
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    config = orjson.loads(data)
     log_end("load_parameters", start)
     return config
 
+# Sets the fields derived from the config once per load, so that main() and the
+# workers only read them: the file-name-safe module name and the parsed start time.
+def derive_config_fields(config_main):
+    config_main['module_name_safe'] = config_main['module_name'].replace(' ', '_')
+    config_main['start_time_dt'] = parse_start_time(config_main['start_time'])
+    return config_main
+
+# Directory of the cached parsed configs.
+CONFIG_CACHE_DIR = os.path.join(user_cache_dir(), 'configs')
+
+# Version of the cached config layout; part of the cache key.
+CONFIG_CACHE_VERSION = 2
+
+# Loads the configuration, reusing a parsed copy from the per-user cache.
+def load_parameters_cached(config_file='laser_parameters.json', cache_dir=CONFIG_CACHE_DIR):
+    """
+    The parsed config (with the derived fields already set) is pickled to
+    <cache_dir>/<sha1 of the absolute config path>.pkl together with the mtime and
+    size of the JSON file; while those are unchanged, later runs load the pickle
+    instead of parsing JSON.
+    """
+    start = log_start("load_parameters_cached", config_file=config_file)
+    st = os.stat(config_file)
+    key = (CONFIG_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+    path_key = hashlib.sha1(os.path.abspath(config_file).encode()).hexdigest()[:12]
+    cache_file = os.path.join(cache_dir, f"{path_key}.pkl")
+
+    try:
+        with open(cache_file, 'rb') as f:
+            cached = pickle.load(f)
+        if cached.get('key') == key:
+            log_end("load_parameters_cached", start)
+            return cached['cfg']
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, TypeError):
+        pass
+
+    config = load_parameters(config_file)
+    derive_config_fields(config['Laser_Subsystem'])
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump({'key': key, 'cfg': config}, f, protocol=5)
+    except OSError as e:
+        print(f"[{datetime.now()}] Config cache not written: {e}")
+    log_end("load_parameters_cached", start)
+    return config
+
 # =========================
 #  Timestamp Generation Functions
 # =========================
 
-# Generates a list of timestamps given a start time, duration, and sampling rate.
-def generate_timestamps(start_time_str, duration, sampling_rate):
+# Parses a '%Y-%m-%dT%H:%M:%SZ' start time, memoized since the format is fixed.
+@functools.lru_cache(maxsize=None)
+def parse_start_time(start_time_str):
+    return datetime.strptime(start_time_str, "%Y-%m-%dT%H:%M:%SZ")
+
+# Generates the timestamps of the samples [first_sample, first_sample + n_samples) of a run.
+def generate_timestamps(run_start, sampling_rate, first_sample, n_samples):
     """
-    Generates a list of timestamps with the specified sampling rate.
+    Generates a DatetimeIndex of n_samples timestamps with the specified sampling rate,
+    computed as integer nanosecond offsets in a single np.arange.
+    run_start is the time of sample 0 of the run, as a datetime (kept to the
+    microsecond) or a '%Y-%m-%dT%H:%M:%SZ' string. Every offset is taken from
+    run_start, so the chunks of a run all lie on the same uniform grid.
     """
     start = log_start("generate_timestamps",
-                      start_time_str=start_time_str,
-                      duration=duration,
-                      sampling_rate=sampling_rate)
-    start_time = datetime.strptime(start_time_str, "%Y-%m-%dT%H:%M:%SZ")
-    total_samples = int(duration * sampling_rate)
-    timestamps = [start_time + timedelta(seconds=i / sampling_rate) for i in range(total_samples)]
+                      run_start=run_start,
+                      sampling_rate=sampling_rate,
+                      first_sample=first_sample,
+                      n_samples=n_samples)
+    if isinstance(run_start, str):
+        run_start = parse_start_time(run_start)
+    start_ns = np.datetime64(run_start, 'ns').astype(np.int64)
+    # Offsets are rounded to whole microseconds, like timedelta(seconds=i / sampling_rate).
+    samples = np.arange(first_sample, first_sample + n_samples, dtype=np.int64)
+    offsets_ns = np.rint(samples * (1e6 / sampling_rate)).astype(np.int64) * 1000
+    timestamps = pd.DatetimeIndex((start_ns + offsets_ns).view('datetime64[ns]'))
     log_end("generate_timestamps", start)
     return timestamps
 
+# Picks the storage dtype of the parameter values.
+def value_dtype(parameters, decimal_places):
+    """
+    Returns float32 when every value (up to base + 3*std) keeps all its digits at the
+    given decimal places within float32's 6 exact significant digits, float64 otherwise.
+    float32 halves the memory traffic of the whole pipeline.
+    """
+    peak = max((abs(det.get('default', 50)) * (1 + 3 * det.get('variation_prc', 0.01))
+                for det in parameters.values()), default=0.0)
+    int_digits = len(str(int(peak)))
+    return np.float32 if int_digits + decimal_places <= 6 else np.float64
+
 # Creates a pandas DataFrame with random values for each parameter based on a given seed.
-def create_dataframe_with_unique_seed(timestamps, parameters, seed, decimal_places=2):
+def create_dataframe_with_unique_seed(timestamps, parameters, seed, decimal_places=2, rng=None):
     """
     Creates a DataFrame where for each timestamp random parameter values are generated
-    (N(base, base*variation_prc)) using the specified seed.
+    (N(base, base*variation_prc)) using the specified seed (or the given generator).
+    The noise for all parameters is drawn in one (T, P) call and scaled by the
+    per-parameter std vector, instead of one draw per parameter.
     """
     start = log_start("create_dataframe_with_unique_seed", num_timestamps=len(timestamps))
-    np.random.seed(seed)
-    random.seed(seed)
-    data_dict = {'Timestamp': timestamps}
-    for param, det in parameters.items():
-        base = det.get('default', 50)
-        var_prc = det.get('variation_prc', 0.01)
-        std = base * var_prc
-        vals = base + np.random.normal(0, std, len(timestamps))
-        vals = np.round(vals, decimals=decimal_places)
-        data_dict[param] = vals
-    df = pd.DataFrame(data_dict)
+    if rng is None:
+        rng = make_rng(seed)
+    names = list(parameters)
+    n_params = len(names)
+    bases = np.fromiter((det.get('default', 50) for det in parameters.values()),
+                        dtype=np.float64, count=n_params)
+    var_prc = np.fromiter((det.get('variation_prc', 0.01) for det in parameters.values()),
+                          dtype=np.float64, count=n_params)
+    stds = bases * var_prc
+    noise = rng.standard_normal((len(timestamps), n_params), dtype=np.float32)
+    # Rounding as rint(x * 10^dp) / 10^dp, with 10^dp folded into the noise scaling
+    # and the other steps done in place on the one (T, P) buffer.
+    scale = 10.0 ** decimal_places
+    vals = noise * (stds * scale)
+    vals += bases * scale
+    np.rint(vals, out=vals)
+    vals /= scale
+    vals = vals.astype(value_dtype(parameters, decimal_places), copy=False)
+    df = pd.DataFrame(vals, columns=names)
+    df.insert(0, 'Timestamp', timestamps)
     log_end("create_dataframe_with_unique_seed", start)
     return df
 
@@ -369,21 +555,30 @@ def clip_parameters(data, config, max_degradation_per_param=None):
     start = log_start("clip_parameters")
     parameters = config['parameters']
     decimal_places = config.get('decimal_places', 2)
-    for p, det in parameters.items():
-        prc = det.get('variation_prc', 0)
-        if prc == 0.0:
-            continue
-        base = det.get('default', 50)
-        std = base * prc
-        if max_degradation_per_param and p in max_degradation_per_param:
-            degradation_prc = max_degradation_per_param[p]
-            low = base * (1 - degradation_prc) - 3 * std
-        else:
-            low = base - 3 * std
-        high = base + 3 * std
-        if p in data.columns:
-            clipped = np.clip(data[p], low, high)
-            data[p] = np.round(clipped, decimals=decimal_places)
+    if max_degradation_per_param is None:
+        max_degradation_per_param = {}
+
+    # Bounds of all clipped columns as length-P arrays.
+    cols = [p for p, det in parameters.items()
+            if det.get('variation_prc', 0.01) != 0.0 and p in data.columns]
+    if not cols:
+        log_end("clip_parameters", start)
+        return
+    bases = np.array([parameters[p].get('default', 50) for p in cols], dtype=np.float64)
+    stds  = bases * np.array([parameters[p].get('variation_prc', 0.01) for p in cols], dtype=np.float64)
+    degradation_prc = np.array([max_degradation_per_param.get(p, 0.0) for p in cols],
+                               dtype=np.float64)
+    low  = bases * (1 - degradation_prc) - 3 * stds
+    high = bases + 3 * stds
+
+    # Clip and round every column in two calls over one 2-D block. Both are done in
+    # float64 and the result is cast back to the storage dtype once, so float32 data
+    # is rounded exactly like the fused kernel does.
+    store_dtype = np.result_type(*data[cols].dtypes)
+    arr = data[cols].to_numpy(dtype=np.float64, copy=True)
+    np.clip(arr, low, high, out=arr)
+    np.round(arr, decimals=decimal_places, out=arr)
+    data[cols] = arr.astype(store_dtype, copy=False)
     log_end("clip_parameters", start)
 
 # =========================
@@ -405,6 +600,9 @@ def generate_degradation_events(config_main):
 
     total_dur = config_main['duration']
 
+    # Scheduled events per parameter as sorted, non-overlapping start/end lists.
+    scheduled_by_param = {}
+
     for d in degr_params:
         param = d.get('parameter')
         dprc  = d.get('degradation_percent', 0)
@@ -413,7 +611,7 @@ def generate_degradation_events(config_main):
         dtype = d.get('degradation_type', 'gradual')
         if param and dsec > 0 and ndeg > 0:
             max_start = total_dur - dsec
-            scheduled = []
+            starts, ends = scheduled_by_param.setdefault(param, ([], []))
             for _ in range(ndeg):
                 if max_start <= 0:
                     break
@@ -422,14 +620,15 @@ def generate_degradation_events(config_main):
                 st_dt   = config_main['start_time_dt'] + timedelta(seconds=start_t)
                 et_dt   = config_main['start_time_dt'] + timedelta(seconds=end_t)
 
-                # Check overlaps (to avoid accidental stacking)
-                overlap = False
-                for s in scheduled:
-                    if not (et_dt <= s['start_time'] or st_dt >= s['end_time']):
-                        overlap = True
-                        break
-                if overlap:
+                # Check overlaps (to avoid accidental stacking). The scheduled intervals
+                # are sorted and disjoint, so only the neighbours of the insertion point matter.
+                pos = bisect_left(starts, st_dt)
+                if pos > 0 and ends[pos - 1] > st_dt:
+                    continue
+                if pos < len(starts) and starts[pos] < et_dt:
                     continue
+                starts.insert(pos, st_dt)
+                ends.insert(pos, et_dt)
 
                 ev = {
                     'parameter': param,
@@ -439,112 +638,80 @@ def generate_degradation_events(config_main):
                     'degradation_type': dtype
                 }
                 all_events.append(ev)
-                scheduled.append(ev)
 
     print(f"[{datetime.now()}] Generated {len(all_events)} degradation events.")
     log_end("generate_degradation_events", start)
     return all_events
 
-# Applies degradation events to the generated data.
-def apply_degradation(data: pd.DataFrame,
-                      degradation_events: List[Dict[str,Any]],
-                      config_main: dict) -> (List[Dict[str,Any]], Dict[str, np.ndarray]):
+# Degradation factor (from 0 to 1) per degradation type, vectorized over an array of t_frac.
+# Unknown types fall back to linear; 'missing' has no factor (apply_degradation sets NaN).
+DEGRADATION_FACTORS = {
+    # Linear from 0 to 1
+    'gradual': lambda t: t,
+    'linear': lambda t: t,
+    # Factor is 0 until half the interval, then suddenly 1
+    'step': lambda t: np.where(t >= 0.5, 1.0, 0.0),
+    # Smooth degradation using cosine: factor(t) = (1 - cos(pi*t_frac)) / 2
+    'cosine': lambda t: (1 - np.cos(np.pi * t)) / 2,
+    # Example: 1 - e^{-3*t_frac}, at t_frac=1 => ~0.95
+    'exponential': lambda t: 1 - np.exp(-3 * t),
+    # Instant degradation at the beginning
+    'instantaneous': lambda t: np.ones_like(t),
+}
+
+# Integer ids of the degradation types, used by the fused kernel.
+DEG_LINEAR, DEG_STEP, DEG_COSINE, DEG_EXPONENTIAL, DEG_INSTANTANEOUS, DEG_MISSING = range(6)
+DEGRADATION_TYPE_IDS = {
+    'gradual': DEG_LINEAR,
+    'linear': DEG_LINEAR,
+    'step': DEG_STEP,
+    'cosine': DEG_COSINE,
+    'exponential': DEG_EXPONENTIAL,
+    'instantaneous': DEG_INSTANTANEOUS,
+    'missing': DEG_MISSING,
+}
+
+# Locates the degradation events of a chunk as row ranges of its timestamps.
+def plan_degradation(ts_ns: np.ndarray,
+                     degradation_events: List[Dict[str,Any]],
+                     parameters: dict):
     """
-    Applies degradation events to the data:
-    - Takes the original (already noised) parameter value.
-    - For the interval [start_time, end_time) computes t_frac = (t - start_time)/(end_time - start_time).
-    - Depending on the degradation type, gradually decreases (or uses "step"/"cosine", etc.) the value by dprc*factor(t_frac).
-    Returns a list of applied events and degradation flags for logging.
+    Finds the rows [i0, i1) of the chunk with start_time <= t < end_time of each event
+    by binary search (timestamps are monotonic). The events keep their own start and
+    end, so an event spanning several chunks follows one degradation curve across
+    them. Events on parameters without variation are skipped.
+    Returns the applied events and their row ranges as tuples
+    (param, i0, i1, st_ns, et_ns, dprc, deg_type).
     """
-    start = log_start("apply_degradation")
-    if data.empty:
-        log_end("apply_degradation", start)
-        return [], {}
-
     applied = []
-    chunk_start = data['Timestamp'].iloc[0]
-    chunk_end   = data['Timestamp'].iloc[-1]
-
-    # Initialize degradation flags for each parameter.
-    degradation_flags = {param: np.zeros(len(data), dtype=bool) for param in config_main['parameters']}
+    ranges  = []
+    if len(ts_ns) == 0:
+        return applied, ranges
 
     for evt in degradation_events:
         param = evt['parameter']
-        if param not in data.columns:
+        if param not in parameters:
             continue
-        st = max(evt['start_time'], chunk_start)
-        et = min(evt['end_time'],   chunk_end)
+        st = evt['start_time']
+        et = evt['end_time']
         if st >= et:
             continue
 
-        idxs = data.index[(data['Timestamp'] >= st) & (data['Timestamp'] < et)]
-        if len(idxs) == 0:
+        st_ns = pd.Timestamp(st).value
+        et_ns = pd.Timestamp(et).value
+        i0, i1 = np.searchsorted(ts_ns, [st_ns, et_ns])
+        if i0 >= i1:
             continue
 
         deg_type = evt['degradation_type']
         dprc     = evt['degradation_percent']
-        base     = config_main['parameters'][param]['default']
-        var_prc  = config_main['parameters'][param]['variation_prc']
+        var_prc  = parameters[param].get('variation_prc', 0.01)
 
         if var_prc == 0:
             # no degradation if variation is zero
             continue
 
-        dur_sec   = (et - st).total_seconds()
-        times     = data.loc[idxs, 'Timestamp']
-
-        # Define degradation factor function (from 0 to 1) based on type.
-        def degradation_factor(t_frac: float) -> float or None:
-            # t_frac from 0 to 1
-            if deg_type in ['gradual', 'linear']:
-                # Linear from 0 to 1
-                return t_frac
-
-            elif deg_type == 'step':
-                # Factor is 0 until half the interval, then suddenly 1
-                return 1.0 if t_frac >= 0.5 else 0.0
-
-            elif deg_type == 'cosine':
-                # Smooth degradation using cosine: factor(t) = (1 - cos(pi*t_frac)) / 2
-                return (1 - cos(pi * t_frac)) / 2
-
-            elif deg_type == 'exponential':
-                # Example: 1 - e^{-3*t_frac}, at t_frac=1 => ~0.95
-                k = 3
-                return 1 - exp(-k * t_frac)
-
-            elif deg_type == 'instantaneous':
-                # Instant degradation at the beginning
-                return 1.0
-
-            elif deg_type == 'missing':
-                # Turn data into NaN
-                return None
-
-            else:
-                # Unknown type — fallback to linear
-                return t_frac
-
-        # Apply degradation to each value in the interval.
-        for i in idxs:
-            t_current = times.loc[i]
-            t_frac = 0
-            if dur_sec > 0:
-                t_frac = (t_current - st).total_seconds() / dur_sec
-                t_frac = max(0, min(1, t_frac))
-
-            current_val = data.at[i, param]
-            f = degradation_factor(t_frac)
-            if f is None:
-                # missing => set NaN
-                data.at[i, param] = np.nan
-                degradation_flags[param][i] = False  # NaN is not counted as degraded
-            else:
-                # Decrease value by degradation percentage scaled by factor.
-                new_val = current_val * (1.0 - dprc * f)
-                data.at[i, param] = new_val
-                degradation_flags[param][i] = True if f > 0 else False
-
+        ranges.append((param, int(i0), int(i1), st_ns, et_ns, float(dprc), deg_type))
         applied.append({
             'parameter': param,
             'start_time': st,
@@ -552,46 +719,256 @@ def apply_degradation(data: pd.DataFrame,
             'degradation_percent': dprc,
             'degradation_type': deg_type
         })
+    return applied, ranges
+
+# Applies degradation events to the generated data.
+def apply_degradation(data: pd.DataFrame,
+                      degradation_events: List[Dict[str,Any]],
+                      config_main: dict) -> (List[Dict[str,Any]], Dict[str, np.ndarray]):
+    """
+    Applies degradation events to the data:
+    - Takes the original (already noised) parameter value.
+    - For the interval [start_time, end_time) computes t_frac = (t - start_time)/(end_time - start_time).
+    - Depending on the degradation type, gradually decreases (or uses "step"/"cosine", etc.) the value by dprc*factor(t_frac).
+    Returns a list of applied events and degradation flags for logging.
+    """
+    start = log_start("apply_degradation")
+    if data.empty:
+        log_end("apply_degradation", start)
+        return [], {}
+
+    ts_ns = data['Timestamp'].to_numpy().astype('datetime64[ns]').view('i8')
+    applied, ranges = plan_degradation(ts_ns, degradation_events, config_main['parameters'])
+
+    # Initialize degradation flags for each parameter.
+    degradation_flags = {param: np.zeros(len(data), dtype=bool) for param in config_main['parameters']}
+
+    for param, i0, i1, st_ns, et_ns, dprc, deg_type in ranges:
+        # Work on a copy of the column and write it back once per event.
+        col = data[param].to_numpy(copy=True)
+        if deg_type == 'missing':
+            # missing => set NaN in one slice assignment (NaN is not counted as degraded)
+            col[i0:i1] = np.nan
+            degradation_flags[param][i0:i1] = False
+        else:
+            factor = DEGRADATION_FACTORS.get(deg_type, DEGRADATION_FACTORS['linear'])
+            t_frac = np.clip((ts_ns[i0:i1] - st_ns) / (et_ns - st_ns), 0.0, 1.0)
+            f = factor(t_frac)
+            # Decrease values by degradation percentage scaled by factor.
+            col[i0:i1] *= (1.0 - dprc * f)
+            degradation_flags[param][i0:i1] = f > 0
+        data[param] = col
 
     log_end("apply_degradation", start)
     return applied, degradation_flags
 
+# Maximum degradation percentage per parameter over the events of a chunk.
+def max_degradation_by_param(chunk_events: List[Dict[str,Any]]) -> Dict[str, float]:
+    max_degradation_per_param = {}
+    for e in chunk_events:
+        p = e['parameter']
+        frac = e['degradation_percent']
+        if p not in max_degradation_per_param or frac > max_degradation_per_param[p]:
+            max_degradation_per_param[p] = frac
+    return max_degradation_per_param
+
+# =========================
+#  Fused Chunk Kernel
+# =========================
+
+# Rows per parallel block of the fused kernel.
+FUSED_BLOCK_ROWS = 256
+
+if NUMBA_AVAILABLE:
+    # Degradation factor (from 0 to 1) of one sample, same math as DEGRADATION_FACTORS.
+    @njit(inline='always', cache=True)
+    def _degradation_factor(type_id, t_ns, st_ns, et_ns):
+        if type_id == DEG_INSTANTANEOUS:
+            return 1.0
+        t_frac = min(1.0, max(0.0, (t_ns - st_ns) / (et_ns - st_ns)))
+        if type_id == DEG_STEP:
+            return 1.0 if t_frac >= 0.5 else 0.0
+        if type_id == DEG_COSINE:
+            return (1.0 - np.cos(np.pi * t_frac)) / 2.0
+        if type_id == DEG_EXPONENTIAL:
+            return 1.0 - np.exp(-3.0 * t_frac)
+        return t_frac
+
+    # Generates, degrades, clips and rounds a (T, P) chunk in one pass over memory.
+    @njit(parallel=True, cache=True)
+    def _fused_chunk_kernel(noise, bases, stds, low, high, ts_ns,
+                            ev_ptr, ev_rows, ev_dprc, scale, out, flags):
+        """
+        ev_ptr[p]:ev_ptr[p+1] are the events of parameter p in ev_rows/ev_dprc, sorted
+        by row; ev_rows holds (i0, i1, st_ns, et_ns, type_id) per event. The events of a
+        parameter do not overlap. Blocks of rows run in parallel; within a block the
+        rows are walked in memory order with one event cursor per parameter.
+        bases and stds come pre-multiplied by scale = 10^decimal_places, so the first
+        rounding is a single rint.
+        """
+        n_rows, n_params = noise.shape
+        n_blocks = (n_rows + FUSED_BLOCK_ROWS - 1) // FUSED_BLOCK_ROWS
+        for b in prange(n_blocks):
+            r0 = b * FUSED_BLOCK_ROWS
+            r1 = min(r0 + FUSED_BLOCK_ROWS, n_rows)
+            cursor = ev_ptr[:-1].copy()
+            for t in range(r0, r1):
+                for p in range(n_params):
+                    # Noise, rounded and stored at the output precision.
+                    out[t, p] = np.rint(bases[p] + noise[t, p] * stds[p]) / scale
+
+                    e = cursor[p]
+                    while e < ev_ptr[p + 1] and ev_rows[e, 1] <= t:
+                        e += 1
+                    cursor[p] = e
+                    if e < ev_ptr[p + 1] and ev_rows[e, 0] <= t:
+                        if ev_rows[e, 4] == DEG_MISSING:
+                            # NaN is not counted as degraded and is not clipped.
+                            out[t, p] = np.nan
+                            continue
+                        f = _degradation_factor(ev_rows[e, 4], ts_ns[t], ev_rows[e, 2], ev_rows[e, 3])
+                        out[t, p] = out[t, p] * (1.0 - ev_dprc[e] * f)
+                        flags[t, p] = f > 0
+
+                    # Clipped and rounded in float64, stored once at the storage dtype,
+                    # like clip_parameters.
+                    v = min(max(out[t, p], low[p]), high[p])
+                    out[t, p] = np.rint(v * scale) / scale
+
+# Generates the values of one chunk straight into out with the fused kernel (Numba only).
+def generate_chunk_values(timestamps: pd.DatetimeIndex,
+                          config_main: dict,
+                          chunk_events: List[Dict[str,Any]],
+                          rng: np.random.Generator,
+                          out: np.ndarray):
+    """
+    Same result as create_dataframe_with_unique_seed, apply_degradation and
+    clip_parameters in a row, but the kernel writes each value to out (T, P) once
+    instead of three read+write passes over the chunk. The noise is still drawn with
+    the chunk's NumPy generator, so the values stay reproducible from the seed.
+    Returns the applied events and the degradation flags (views of one (T, P) array).
+    """
+    start = log_start("generate_chunk_values", num_timestamps=len(timestamps))
+    parameters = config_main['parameters']
+    decimal_places = config_main.get('decimal_places', 2)
+    names = list(parameters)
+    n_params = len(names)
+
+    bases = np.fromiter((det.get('default', 50) for det in parameters.values()),
+                        dtype=np.float64, count=n_params)
+    var_prc = np.fromiter((det.get('variation_prc', 0.01) for det in parameters.values()),
+                          dtype=np.float64, count=n_params)
+    stds = bases * var_prc
+
+    # Clip bounds as in clip_parameters; parameters without variation are not clipped.
+    max_degradation_per_param = max_degradation_by_param(chunk_events)
+    degradation_prc = np.array([max_degradation_per_param.get(p, 0.0) for p in names],
+                               dtype=np.float64)
+    low  = np.where(var_prc != 0.0, bases * (1 - degradation_prc) - 3 * stds, -np.inf)
+    high = np.where(var_prc != 0.0, bases + 3 * stds, np.inf)
+
+    # Events as compact arrays grouped by parameter index.
+    ts_ns = timestamps.asi8
+    applied, ranges = plan_degradation(ts_ns, chunk_events, parameters)
+    index = {name: j for j, name in enumerate(names)}
+    ranges.sort(key=lambda r: (index[r[0]], r[1]))
+    ev_param = np.array([index[r[0]] for r in ranges], dtype=np.int64)
+    ev_rows  = np.array([(i0, i1, st_ns, et_ns, DEGRADATION_TYPE_IDS.get(deg_type, DEG_LINEAR))
+                         for _, i0, i1, st_ns, et_ns, _, deg_type in ranges],
+                        dtype=np.int64).reshape(-1, 5)
+    ev_dprc  = np.array([r[5] for r in ranges], dtype=np.float64)
+    ev_ptr   = np.searchsorted(ev_param, np.arange(n_params + 1)).astype(np.int64)
+
+    noise = rng.standard_normal((len(timestamps), n_params), dtype=np.float32)
+    flags = np.zeros((len(timestamps), n_params), dtype=bool)
+    scale = 10.0 ** decimal_places
+    _fused_chunk_kernel(noise, bases * scale, stds * scale, low, high, ts_ns,
+                        ev_ptr, ev_rows, ev_dprc, scale, out, flags)
+
+    degradation_flags = {name: flags[:, j] for j, name in enumerate(names)}
+    log_end("generate_chunk_values", start)
+    return applied, degradation_flags
+
 # =========================
 #  Log Generation Functions
 # =========================
 
-# Generates log entries based on data and degradation flags.
-def generate_logs(data_chunk: pd.DataFrame,
-                  parameters: dict,
-                  degradation_flags: Dict[str, np.ndarray],
-                  phrases_part1: List[str],
-                  phrases_part2: List[str]) -> List[str]:
-    """
-    Generates logs based on degradation flags.
-    """
-    logs = []
-    for idx, row in data_chunk.iterrows():
-        tts = row['Timestamp']
-        for p, det in parameters.items():
-            if p not in data_chunk.columns:
-                continue
-            val = row[p]
-            if pd.isna(val):
-                continue
-            degraded = degradation_flags[p][idx]
-
-            # Pick random phrases for the log entry.
-            ph1 = random.choice(phrases_part1)
-            ph2 = random.choice(phrases_part2)
-
-            if degraded:
-                log_line = (f"[{tts.strftime('%Y-%m-%d %H:%M:%S')}] WARNING: "
-                            f"{ph1} {p} {ph2} Current value: {val} {det.get('unit','units')}")
-            else:
-                log_line = (f"[{tts.strftime('%Y-%m-%d %H:%M:%S')}] INFO: "
-                            f"{ph1} {p} {ph2} Current value: {val} {det.get('unit','units')}")
-            logs.append(log_line)
-    return logs
+# Approximate number of log lines built in memory at once.
+LOG_BLOCK_LINES = 1 << 16
+
+# Default write buffer of the output files (config key 'output_buffer_bytes').
+OUTPUT_BUFFER_BYTES = 1 << 20
+
+# Yields log entries in timestamp order, one block of rows at a time.
+def iter_log_blocks(data_chunk: pd.DataFrame,
+                    parameters: dict,
+                    degradation_flags: Dict[str, np.ndarray],
+                    phrases_part1: List[str],
+                    phrases_part2: List[str],
+                    rng: np.random.Generator = None):
+    """
+    Builds logs based on degradation flags for blocks of about LOG_BLOCK_LINES lines.
+    Within a block, lines are built one parameter column at a time (timestamps, levels
+    and phrases are prepared as whole arrays) and then interleaved back into timestamp order.
+    """
+    if data_chunk.empty:
+        return
+    if rng is None:
+        rng = make_rng()
+
+    n_rows  = len(data_chunk)
+    unit_of = {p: det.get('unit', 'units') for p, det in parameters.items()
+               if p in data_chunk.columns}
+    values  = {p: data_chunk[p].to_numpy() for p in unit_of}
+    phrases1 = np.asarray(phrases_part1, dtype=object)
+    phrases2 = np.asarray(phrases_part2, dtype=object)
+    block_rows = max(1, LOG_BLOCK_LINES // max(len(unit_of), 1))
+
+    for r0 in range(0, n_rows, block_rows):
+        r1 = min(r0 + block_rows, n_rows)
+        # Format every timestamp of the block once, outside the line loop.
+        ts_str = data_chunk['Timestamp'].iloc[r0:r1].dt.strftime('%Y-%m-%d %H:%M:%S').to_list()
+
+        # Pick random phrases for the whole block at once: one (P, rows) index draw per list.
+        idx1 = rng.integers(0, len(phrases1), size=(len(unit_of), r1 - r0))
+        idx2 = rng.integers(0, len(phrases2), size=(len(unit_of), r1 - r0))
+
+        columns = []
+        for j, (p, unit) in enumerate(unit_of.items()):
+            col    = values[p][r0:r1]
+            # astype(str) gives the shortest repr of the column's own dtype (float32 or float64).
+            vals   = col.astype(str).tolist()
+            valid  = (~np.isnan(col)).tolist()
+            levels = np.where(degradation_flags[p][r0:r1], 'WARNING', 'INFO')
+            ph1    = phrases1[idx1[j]]
+            ph2    = phrases2[idx2[j]]
+
+            # NaN values produce no log line.
+            columns.append([f"[{t}] {lvl}: {a} {p} {b} Current value: {v} {unit}" if ok else None
+                            for t, lvl, a, b, v, ok in zip(ts_str, levels, ph1, ph2, vals, valid)])
+
+        yield [line for row in zip(*columns) for line in row if line is not None]
+
+# Writes log entries straight to an open text file.
+def write_logs(f,
+               data_chunk: pd.DataFrame,
+               parameters: dict,
+               degradation_flags: Dict[str, np.ndarray],
+               phrases_part1: List[str],
+               phrases_part2: List[str],
+               rng: np.random.Generator = None) -> int:
+    """
+    Streams logs to the file block by block, without holding all lines in memory.
+    Returns the number of lines written.
+    """
+    count = 0
+    for block in iter_log_blocks(data_chunk, parameters, degradation_flags,
+                                 phrases_part1, phrases_part2, rng):
+        if block:
+            f.write("\n".join(block))
+            f.write("\n")
+            count += len(block)
+    return count
 
 # =========================
 #  Final Report Functions
@@ -636,138 +1013,521 @@ def generate_result_report(config_main,
 
 # Divides degradation events among chunks for parallel processing.
 def assign_degradations_to_chunks(degr_events: List[Dict[str,Any]],
-                                  chunk_starts: List[datetime],
-                                  interval_duration: float) -> List[List[Dict[str,Any]]]:
+                                  chunk_bounds: np.ndarray) -> List[List[Dict[str,Any]]]:
     """
     Divides the list of degradations into chunks for parallel processing.
-    If a degradation overlaps a chunk boundary, it is split.
-    """
-    chunked = [[] for _ in range(len(chunk_starts))]
-    for e in degr_events:
-        for i, st in enumerate(chunk_starts):
-            chunk_end = st + timedelta(seconds=interval_duration)
-            # Check for overlap between the event and the chunk.
-            if e['start_time'] < chunk_end and e['end_time'] > st:
-                new_e = e.copy()
-                # Limit the event to the chunk boundaries.
-                new_e['start_time'] = max(e['start_time'], st)
-                new_e['end_time']   = min(e['end_time'],   chunk_end)
-                chunked[i].append(new_e)
+    chunk_bounds is a datetime64 array (a list of datetimes is accepted too) of the
+    n_chunks + 1 chunk boundaries: chunk i covers [chunk_bounds[i], chunk_bounds[i + 1]).
+    A degradation overlapping several chunks is given to each of them unchanged,
+    keeping its original start and end.
+    """
+    chunked = [[] for _ in range(max(len(chunk_bounds) - 1, 0))]
+    if not degr_events or not chunked:
+        return chunked
+
+    chunk_bounds = np.asarray(chunk_bounds, dtype='datetime64[us]')
+    chunk_starts = chunk_bounds[:-1]
+    chunk_ends   = chunk_bounds[1:]
+    chunk_starts_ns = chunk_starts.astype('datetime64[ns]').view('i8')
+    chunk_ends_ns   = chunk_ends.astype('datetime64[ns]').view('i8')
+
+    # For every event find the range of chunks it overlaps:
+    # chunks ending after the event starts and starting before it ends.
+    ev_starts_ns = np.array([e['start_time'] for e in degr_events], dtype='datetime64[ns]').view('i8')
+    ev_ends_ns   = np.array([e['end_time']   for e in degr_events], dtype='datetime64[ns]').view('i8')
+    i_lo = np.searchsorted(chunk_ends_ns, ev_starts_ns, side='right')
+    i_hi = np.searchsorted(chunk_starts_ns, ev_ends_ns, side='left')
+
+    for e, lo, hi in zip(degr_events, i_lo, i_hi):
+        for i in range(lo, hi):
+            chunked[i].append(e)
     return chunked
 
+# Per-process state of the pool workers, filled once by _init_worker.
+_WORKER_STATE: Dict[str, Any] = {}
+
+# Allocates a NumPy array backed by a new shared memory block.
+def create_shared_array(shape, dtype):
+    """
+    Returns the SharedMemory block (the caller closes and unlinks it) and the array view.
+    """
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+# Closes and removes a shared memory block created by this process.
+def release_shared_memory(shm):
+    shm.close()
+    shm.unlink()
+
+# Checks whether shared memory blocks of nbytes in total fit in /dev/shm.
+def shared_memory_fits(nbytes: int, shm_dir: str = '/dev/shm') -> bool:
+    """
+    On Linux the blocks live in the /dev/shm tmpfs, whose pages are only allocated when
+    first written: blocks larger than its free space are created fine, and the worker
+    touching the missing pages dies with SIGBUS. True where shm_dir is missing.
+    """
+    if not os.path.isdir(shm_dir):
+        return True
+    return nbytes <= shutil.disk_usage(shm_dir).free
+
+# Attaches to a shared memory block created by create_shared_array.
+def attach_shared_array(name: str, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+# Allocates a result array shared with the workers, in shared memory or in a file.
+def create_result_array(shape, dtype, path: str = None):
+    """
+    Without a path the array is backed by a new shared memory block; with a path by a
+    new file there (a np.memmap, shared with the workers through the page cache), for
+    results too large for /dev/shm.
+    Returns the array, the (kind, name, shape, dtype) arguments for attach_result_array
+    and a function that releases the storage once the array is dropped.
+    """
+    dtype = np.dtype(dtype)
+    if path is None:
+        shm, arr = create_shared_array(shape, dtype)
+        return arr, ('shm', shm.name, shape, dtype.str), functools.partial(release_shared_memory, shm)
+    path = os.path.abspath(path)
+    arr = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+    return arr, ('file', path, shape, dtype.str), functools.partial(os.remove, path)
+
+# Attaches to a result array created by create_result_array.
+def attach_result_array(kind: str, name: str, shape, dtype):
+    """
+    Returns the SharedMemory block (None for a file) and the array.
+    """
+    if kind == 'file':
+        return None, np.memmap(name, dtype=np.dtype(dtype), mode='r+', shape=shape)
+    return attach_shared_array(name, shape, dtype)
+
+# Copies the parameters into a shared memory block for the workers.
+def share_parameters(parameters: dict):
+    """
+    Places all parameters into shared memory as one structured array with the fields
+    name, unit, default and variation_prc, so that workers attach to it once at
+    startup instead of unpickling the parameters dict.
+    Returns the SharedMemory block (the caller closes and unlinks it) and the
+    (name, shape, dtype) arguments for attach_shared_array.
+    """
+    names = list(parameters)
+    units = [det.get('unit', 'units') for det in parameters.values()]
+    dtype = np.dtype([('name', f'U{max(map(len, names), default=1)}'),
+                      ('unit', f'U{max(map(len, units), default=1)}'),
+                      ('default', np.float64),
+                      ('variation_prc', np.float64)])
+    shm, table = create_shared_array((len(names),), dtype)
+    try:
+        table['name'] = names
+        table['unit'] = units
+        table['default'] = [det.get('default', 50) for det in parameters.values()]
+        table['variation_prc'] = [det.get('variation_prc', 0.01) for det in parameters.values()]
+    except BaseException:
+        del table
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, (shm.name, table.shape, dtype)
+
+# Numba threads of the fused kernel per pool process.
+def numba_threads_per_worker(n_workers: int):
+    """
+    Shares Numba's thread pool between the n_workers processes. The pool size is
+    NUMBA_NUM_THREADS (the CPUs available to the process, or the environment variable
+    of that name), the upper bound accepted by set_num_threads; os.cpu_count() may be
+    larger under taskset or a container CPU set. None without Numba.
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    pool_size = numba_config.NUMBA_NUM_THREADS
+    return min(pool_size, max(1, pool_size // n_workers))
+
+# Pool initializer: stores the run config, rebuilds the parameters and attaches the
+# shared result arrays once per worker.
+def _init_worker(config_main, param_args, phrases_part1, phrases_part2, result_args,
+                 numba_threads=None):
+    """
+    config_main is the run config without its parameters; param_args is the
+    (name, shape, dtype) of the shared parameters table (see share_parameters) and
+    result_args the (kind, name, shape, dtype) of the values and timestamps arrays
+    (see create_result_array).
+    numba_threads caps the threads of the fused kernel in this process.
+    """
+    # Share the cores between the pool processes instead of each kernel using all of them.
+    if NUMBA_AVAILABLE and numba_threads:
+        set_num_threads(numba_threads)
+
+    shm, table = attach_shared_array(*param_args)
+    _WORKER_STATE['parameters'] = {
+        name: {'default': base, 'variation_prc': var_prc, 'unit': unit}
+        for name, unit, base, var_prc in table.tolist()
+    }
+    del table
+    shm.close()
+    _WORKER_STATE['config'] = config_main
+    _WORKER_STATE['phrases_part1'] = phrases_part1
+    _WORKER_STATE['phrases_part2'] = phrases_part2
+
+    # The result blocks stay attached for the lifetime of the worker.
+    (vals_shm, vals_out), (ts_shm, ts_out) = (attach_result_array(*a) for a in result_args)
+    _WORKER_STATE['result_shm'] = (vals_shm, ts_shm)
+    _WORKER_STATE['values_out'] = vals_out
+    _WORKER_STATE['timestamps_out'] = ts_out
+
+# Pool task: generates a batch of chunks into the shared result arrays of the worker.
+def _worker(batch):
+    results = []
+    for run_start, n_samples, chunk_events, seed, chunk_index, row_offset in batch:
+        results.append(generate_data_for_interval(run_start, n_samples, _WORKER_STATE['config'],
+                                                  chunk_events, seed, chunk_index,
+                                                  _WORKER_STATE['values_out'],
+                                                  _WORKER_STATE['timestamps_out'],
+                                                  row_offset=row_offset))
+    return results
+
 # Generates data and logs for a specific time interval (chunk).
-def generate_data_for_interval(start_time: datetime,
-                               duration: float,
+def generate_data_for_interval(run_start: datetime,
+                               n_samples: int,
                                config_main: dict,
                                chunk_events: List[Dict[str,Any]],
                                seed: int,
                                chunk_index: int,
-                               phrases_part1: List[str],
-                               phrases_part2: List[str]) -> Dict[str,Any]:
+                               values_out: np.ndarray,
+                               timestamps_out: np.ndarray,
+                               phrases_part1: List[str] = None,
+                               phrases_part2: List[str] = None,
+                               row_offset: int = 0) -> Dict[str,Any]:
     """
-    Function that generates data and logs for one chunk.
+    Function that generates data and logs for one chunk: the n_samples samples
+    starting at sample row_offset of the run that starts at run_start.
+    The data is written into rows [row_offset, row_offset + rows_count) of values_out
+    (T_total, P) and timestamps_out (T_total,) as int64 nanoseconds; nothing is sent
+    back to the parent but the counters and the applied events, pre-serialized with
+    orjson (see encode_events).
+    In a pool worker, the parameters (when missing from config_main) and the phrases
+    (when None) are taken from the state set up by _init_worker; a direct call passes
+    them, together with result arrays of at least row_offset + n_samples rows.
     """
     try:
+        if 'parameters' not in config_main:
+            config_main = {**config_main, 'parameters': _WORKER_STATE['parameters']}
+        if phrases_part1 is None:
+            phrases_part1 = _WORKER_STATE['phrases_part1']
+        if phrases_part2 is None:
+            phrases_part2 = _WORKER_STATE['phrases_part2']
+
+        # One generator per chunk, shared by the noise and the log phrases.
+        rng = make_rng(seed)
         dec_places = config_main.get('decimal_places', 2)
-        timestamps = generate_timestamps(
-            start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            duration,
-            config_main['sampling_rate']
-        )
-        df = create_dataframe_with_unique_seed(timestamps,
-                                               config_main['parameters'],
-                                               seed,
-                                               decimal_places=dec_places)
-
-        # Apply degradation events.
-        applied, degradation_flags = apply_degradation(df, chunk_events, config_main)
-
-        # Clipping: Adjust values based on the maximum degradation percentage for each parameter.
-        max_degradation_per_param = {}
-        for e in chunk_events:
-            p = e['parameter']
-            frac = e['degradation_percent']
-            if p not in max_degradation_per_param or frac > max_degradation_per_param[p]:
-                max_degradation_per_param[p] = frac
+        timestamps = generate_timestamps(run_start, config_main['sampling_rate'],
+                                         row_offset, n_samples)
+        row_end = row_offset + len(timestamps)
+        if row_end > len(values_out):
+            raise ValueError(f"Chunk {chunk_index} does not fit the result array "
+                             f"(rows {row_offset}:{row_end} of {len(values_out)}).")
+        names = list(config_main['parameters'])
+        out   = values_out[row_offset:row_end]
+
+        if NUMBA_AVAILABLE:
+            # One fused pass writes the final values into the shared result slice.
+            applied, degradation_flags = generate_chunk_values(timestamps, config_main,
+                                                               chunk_events, rng, out)
+            df = pd.DataFrame(out, columns=names, copy=False)
+            df.insert(0, 'Timestamp', timestamps)
+        else:
+            df = create_dataframe_with_unique_seed(timestamps,
+                                                   config_main['parameters'],
+                                                   seed,
+                                                   decimal_places=dec_places,
+                                                   rng=rng)
+
+            # Apply degradation events.
+            applied, degradation_flags = apply_degradation(df, chunk_events, config_main)
+
+            # Clipping: Adjust values based on the maximum degradation percentage for each parameter.
+            clip_parameters(df, config_main, max_degradation_by_param(chunk_events))
 
-        clip_parameters(df, config_main, max_degradation_per_param)
+            out[:] = df[names].to_numpy()
 
-        # Generate logs based on the degradation flags.
-        logs = generate_logs(df, config_main['parameters'], degradation_flags,
-                             phrases_part1, phrases_part2)
+        timestamps_out[row_offset:row_end] = timestamps.asi8
 
-        # Save the generated data and logs to CSV and log files.
-        fdata = f"data_chunk_{chunk_index}.csv"
+        # Stream the logs, generated from the degradation flags, to the log file.
         flogs = f"logs_chunk_{chunk_index}.log"
-        df.to_csv(fdata, index=False)
-        with open(flogs, 'w', encoding='utf-8') as f:
-            for line in logs:
-                f.write(line + "\n")
+        with open(flogs, 'w', encoding='utf-8',
+                  buffering=config_main.get('output_buffer_bytes', OUTPUT_BUFFER_BYTES)) as f:
+            logs_count = write_logs(f, df, config_main['parameters'], degradation_flags,
+                                    phrases_part1, phrases_part2, rng=rng)
 
         return {
+            'chunk_index': chunk_index,
+            'row_offset': row_offset,
             'rows_count': len(df),
-            'logs_count': len(logs),
-            'applied_events': applied,
-            'data_file': fdata,
+            'logs_count': logs_count,
+            'applied_count': len(applied),
+            'applied_bytes': encode_events(applied),
             'logs_file': flogs,
             'error': None
         }
 
     except Exception as e:
         return {
+            'chunk_index': chunk_index,
+            'row_offset': row_offset,
             'rows_count': 0,
             'logs_count': 0,
-            'applied_events': [],
-            'data_file': None,
+            'applied_count': 0,
+            'applied_bytes': b'[]',
             'logs_file': None,
             'error': str(e)
         }
 
+# The applied events cross the process boundary as one orjson blob per chunk,
+# which the parent decodes in a single parse instead of unpickling many small dicts.
+def _event_time_default(obj):
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError
+
+def encode_events(events: List[Dict[str,Any]]) -> bytes:
+    return orjson.dumps(events, default=_event_time_default)
+
+def decode_events(blobs: List[bytes]) -> List[Dict[str,Any]]:
+    """
+    Joins the per-chunk blobs into one JSON array, parses it once and restores the
+    start and end times as datetimes.
+    """
+    events = orjson.loads(b'[' + b','.join(b[1:-1] for b in blobs if len(b) > 2) + b']')
+    for e in events:
+        e['start_time'] = datetime.fromisoformat(e['start_time'])
+        e['end_time']   = datetime.fromisoformat(e['end_time'])
+    return events
+
 # =========================
 #  File Combination Functions
 # =========================
 
-# Combines all data chunks and log files into final output files.
-def combine_files(num_threads: int, module_name_safe: str):
+# Flushes a finished output file to disk and drops it from the page cache.
+def release_page_cache(path: str):
     """
-    Combines all CSV and LOG files into single files and removes temporary ones.
+    Used for the config key 'use_direct_io': O_DIRECT itself would need aligned
+    buffers, offsets and lengths, which the buffered text and Arrow writers do not
+    provide, so the outputs are written normally and evicted once complete.
+    No-op where os.posix_fadvise is not available.
     """
-    final_data_filename = f"{module_name_safe}_logs.csv"
-    final_logs_filename = f"{module_name_safe}_events.log"
-
-    combined_data = []
-    for i in range(num_threads):
-        fdata = f"data_chunk_{i}.csv"
-        if os.path.exists(fdata):
-            df_chunk = pd.read_csv(fdata, parse_dates=['Timestamp'])
-            combined_data.append(df_chunk)
-            os.remove(fdata)
-
-    if combined_data:
-        combined_data = pd.concat(combined_data, ignore_index=True)
-        combined_data.sort_values(by='Timestamp', inplace=True)
-        combined_data.to_csv(final_data_filename, index=False,
-                             date_format='%Y-%m-%dT%H:%M:%SZ')
-        print(f"[{datetime.now()}] Final data saved to {final_data_filename}")
-    else:
-        print(f"[{datetime.now()}] No data chunks found to combine.")
-
-    with open(final_logs_filename, 'w', encoding='utf-8') as fout:
-        for i in range(num_threads):
-            flog = f"logs_chunk_{i}.log"
-            if os.path.exists(flog):
-                with open(flog, 'r', encoding='utf-8') as fin:
-                    for line in fin:
-                        fout.write(line)
-                os.remove(flog)
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+# Converts a record batch to the CSV layout, with timestamps as '%Y-%m-%dT%H:%M:%SZ' strings.
+def csv_table(batch: pa.RecordBatch) -> pa.Table:
+    table = pa.Table.from_batches([batch])
+    ts = pc.cast(table['Timestamp'], pa.timestamp('s'), safe=False)
+    return table.set_column(table.schema.get_field_index('Timestamp'), 'Timestamp',
+                            pc.strftime(ts, format='%Y-%m-%dT%H:%M:%SZ'))
+
+# Writes the simulated data from the shared result arrays to Parquet and CSV.
+def save_data(module_name_safe: str,
+              names: List[str],
+              timestamps_ns: np.ndarray,
+              values: np.ndarray,
+              row_ranges: List[tuple],
+              buffer_bytes: int = OUTPUT_BUFFER_BYTES,
+              direct_io: bool = False):
+    """
+    Streams the row ranges of the completed chunks, in time order, from the shared
+    buffer into one Parquet file and one CSV file. Each range becomes one Arrow
+    record batch (a Parquet row group), built once and written to both files, so
+    the data never goes through pandas nor is read back; NaN values are written
+    as nulls. With direct_io both files are evicted from the page cache once written.
+    """
+    final_parquet_filename = f"{module_name_safe}_data.parquet"
+    final_data_filename    = f"{module_name_safe}_logs.csv"
+
+    if not row_ranges:
+        print(f"[{datetime.now()}] No data generated to save.")
+        return None, None
+
+    schema = pa.schema([('Timestamp', pa.timestamp('ns'))] +
+                       [(name, pa.from_numpy_dtype(values.dtype)) for name in names])
+    # The header is written by hand: pyarrow would quote the column names.
+    csv_options = pa_csv.WriteOptions(include_header=False, quoting_style='none')
+
+    with pq.ParquetWriter(final_parquet_filename, schema, compression='zstd') as writer, \
+         open(final_data_filename, 'wb', buffering=buffer_bytes) as fcsv:
+        fcsv.write((",".join(schema.names) + "\n").encode('utf-8'))
+        for r0, r1 in sorted(row_ranges):
+            arrays = [pa.array(timestamps_ns[r0:r1].view('datetime64[ns]'))]
+            arrays += [pa.array(values[r0:r1, j], from_pandas=True) for j in range(len(names))]
+            batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            writer.write_batch(batch)
+            pa_csv.write_csv(csv_table(batch), fcsv, csv_options)
+
+    if direct_io:
+        release_page_cache(final_parquet_filename)
+        release_page_cache(final_data_filename)
+
+    print(f"[{datetime.now()}] Final data saved to {final_parquet_filename}")
+    print(f"[{datetime.now()}] Final data saved to {final_data_filename}")
+    return final_parquet_filename, final_data_filename
+
+# Appends the whole file fin to fout.
+def append_file(fin, fout, buffer_bytes: int = OUTPUT_BUFFER_BYTES):
+    """
+    Copies in the kernel with os.sendfile where available (Linux), with no pass
+    through Python buffers; falls back to shutil.copyfileobj elsewhere, or when the
+    file system does not support sendfile.
+    """
+    if hasattr(os, 'sendfile'):
+        fout.flush()
+        src_fd, dst_fd = fin.fileno(), fout.fileno()
+        size   = os.fstat(src_fd).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            fin.seek(offset)
+    shutil.copyfileobj(fin, fout, length=buffer_bytes)
+
+# Writer thread: appends the chunk log files to the final log file as chunks complete.
+def merge_chunk_logs(log_queue: queue.Queue,
+                     final_logs_filename: str,
+                     buffer_bytes: int = OUTPUT_BUFFER_BYTES,
+                     direct_io: bool = False):
+    """
+    Consumes (chunk_index, logs_file) items until None. Chunks complete in any order,
+    so a file is appended only once all earlier chunks are in; the others wait in
+    `pending`. A failed chunk is reported with logs_file None and is skipped.
+    The merge overlaps the generation of the remaining chunks and copies with
+    append_file; with direct_io the final file is evicted from the page cache.
+    """
+    pending = {}
+    next_index = 0
+
+    def append(path):
+        if path and os.path.exists(path):
+            with open(path, 'rb') as fin:
+                append_file(fin, fout, buffer_bytes)
+            os.remove(path)
+
+    with open(final_logs_filename, 'wb', buffering=buffer_bytes) as fout:
+        while (item := log_queue.get()) is not None:
+            chunk_index, path = item
+            pending[chunk_index] = path
+            while next_index in pending:
+                append(pending.pop(next_index))
+                next_index += 1
+        # Chunks left behind a missing index (generation stopped early).
+        for chunk_index in sorted(pending):
+            append(pending[chunk_index])
+
+    if direct_io:
+        release_page_cache(final_logs_filename)
 
     print(f"[{datetime.now()}] Final logs saved to {final_logs_filename}")
-    return final_data_filename, final_logs_filename
 
 # =========================
 #  Main Function
 # =========================
 
+# Builds the default configuration used when no config file is provided.
+@functools.lru_cache(maxsize=1)
+def _default_config() -> dict:
+    """
+    Returns the default configuration. It depends on fixed inputs only, so repeated
+    main() calls in one process (tests, driver loops) reuse it; callers must not modify it.
+    """
+    error_params = [
+        "Main_Laser_Power",
+        "Laser_Wavelength",
+        "Beam_Quality_M2",
+        "Pulse_Frequency"
+    ]
+    variation_ranges = [(0.0, 0.005)]  # vary up to 2%
+    dec_places = 10
+    param_seed = 42  # fixed, so the generated parameters are cached between runs
+
+    print(f"[{datetime.now()}] Generating laser system parameters...")
+    params = generate_parameters_cached(
+        num_parameters = 1000,
+        desired_parameters = error_params,
+        variation_ranges   = variation_ranges,
+        decimal_places = dec_places,
+        seed = param_seed
+    )
+
+    # Example degradation parameters (not used in final configuration below).
+    degrade_params_1 = [
+        {
+            'parameter': 'Main_Laser_Power',
+            'degradation_percent': 0.15,  # Increased to 15%
+            'duration_sec': 1000,
+            'number_of_degradations': 1,
+            'degradation_type': 'gradual'
+        },
+        {
+            'parameter': 'Beam_Quality_M2',
+            'degradation_percent': 0.02,
+            'duration_sec': 1000,
+            'number_of_degradations': 1,
+            'degradation_type': 'cosine'
+        },
+        {
+            'parameter': 'Pulse_Frequency',
+            'degradation_percent': 0.02,
+            'duration_sec': 1000,
+            'number_of_degradations': 1,
+            'degradation_type': 'step'
+        },
+        {
+            'parameter': 'Laser_Wavelength',
+            'degradation_percent': 0.03,
+            'duration_sec': 1000,
+            'number_of_degradations': 1,
+            'degradation_type': 'exponential'
+        }
+    ]
+
+    degrade_params = [
+        {
+            'parameter': 'Main_Laser_Power',
+            'degradation_percent': 0.1,  # Increased to 15%
+            'duration_sec': 1000,
+            'number_of_degradations': 1,
+            'degradation_type': 'cosine'
+        }
+    ]
+
+    config = {
+        "Laser_Subsystem": {
+            "module_name": "Laser_Subsystem.simple.5",
+            "sampling_rate": 20,
+            "duration": 20000,  # seconds
+            "start_time": "2025-01-21T00:00:00Z",
+            "degradation_parameters": degrade_params,
+            "parameters": params,
+            "num_threads": 10,  # increased for performance
+            "over_decomp": 8,   # chunks per worker, for load balancing
+            "chunksize": None,  # chunks handed to a worker at a time (None = auto)
+            "output_buffer_bytes": OUTPUT_BUFFER_BYTES,  # write buffer of the output files
+            "use_direct_io": False,  # evict the finished outputs from the page cache
+            "decimal_places": dec_places
+        }
+    }
+
+    derive_config_fields(config['Laser_Subsystem'])
+    return config
+
 # Main function orchestrating the simulation.
 def main():
     start_main = log_start("main")
@@ -781,159 +1541,164 @@ def main():
         # Load real configuration.
         if os.path.exists(args.config):
             print(f"[{datetime.now()}] Loading configuration from {args.config}...")
-            cf_loaded = load_parameters(args.config)
+            cf_loaded = load_parameters_cached(args.config)
             config_main = cf_loaded['Laser_Subsystem']
-            config_main['start_time_dt'] = datetime.strptime(
-                config_main['start_time'], "%Y-%m-%dT%H:%M:%SZ")
         else:
             print(f"[{datetime.now()}] No config file found: {args.config}")
             log_end("main", start_main)
             return
     else:
-        # Generate default parameters if no config file is provided.
-        error_params = [
-            "Main_Laser_Power",
-            "Laser_Wavelength",
-            "Beam_Quality_M2",
-            "Pulse_Frequency"
-        ]
-        variation_ranges = [(0.0, 0.005)]  # vary up to 2%
-        dec_places = 10
-
-        print(f"[{datetime.now()}] Generating laser system parameters...")
-        params = generate_parameters(
-            num_parameters = 1000,
-            desired_parameters = error_params,
-            variation_ranges   = variation_ranges,
-            decimal_places = dec_places
-        )
-
-        # Example degradation parameters (not used in final configuration below).
-        degrade_params_1 = [
-            {
-                'parameter': 'Main_Laser_Power',
-                'degradation_percent': 0.15,  # Increased to 15%
-                'duration_sec': 1000,
-                'number_of_degradations': 1,
-                'degradation_type': 'gradual'
-            },
-            {
-                'parameter': 'Beam_Quality_M2',
-                'degradation_percent': 0.02,
-                'duration_sec': 1000,
-                'number_of_degradations': 1,
-                'degradation_type': 'cosine'
-            },
-            {
-                'parameter': 'Pulse_Frequency',
-                'degradation_percent': 0.02,
-                'duration_sec': 1000,
-                'number_of_degradations': 1,
-                'degradation_type': 'step'
-            },
-            {
-                'parameter': 'Laser_Wavelength',
-                'degradation_percent': 0.03,
-                'duration_sec': 1000,
-                'number_of_degradations': 1,
-                'degradation_type': 'exponential'
-            }
-        ]
-
-        degrade_params = [
-            {
-                'parameter': 'Main_Laser_Power',
-                'degradation_percent': 0.1,  # Increased to 15%
-                'duration_sec': 1000,
-                'number_of_degradations': 1,
-                'degradation_type': 'cosine'
-            }
-        ]
-
-        config = {
-            "Laser_Subsystem": {
-                "module_name": "Laser_Subsystem.simple.5",
-                "sampling_rate": 20,
-                "duration": 20000,  # seconds
-                "start_time": "2025-01-21T00:00:00Z",
-                "degradation_parameters": degrade_params,
-                "parameters": params,
-                "num_threads": 10,  # increased for performance
-                "decimal_places": dec_places
-            }
-        }
-
-        config['Laser_Subsystem']['start_time_dt'] = datetime.strptime(config['Laser_Subsystem']['start_time'], "%Y-%m-%dT%H:%M:%SZ")
-
-        save_parameters_to_json(params, config, filename='myconfig.json')
+        # Use the default configuration if no config file is provided.
+        hits = _default_config.cache_info().hits
+        config = _default_config()
+        # On a cache hit the file was written by an earlier call, unless it was removed since.
+        if _default_config.cache_info().hits == hits or not os.path.exists('myconfig.json'):
+            save_parameters_to_json(config['Laser_Subsystem']['parameters'], config,
+                                    filename='myconfig.json')
         config_main = config['Laser_Subsystem']
 
-    # Parallel processing parameters.
+    # Parallel processing parameters. The timeline is over-decomposed into
+    # over_decomp chunks per worker, so that a worker finishing early picks up
+    # the next chunk instead of idling while a slower one completes.
     n_threads = config_main['num_threads']
+    n_chunks  = n_threads * max(1, config_main.get('over_decomp', 8))
     dur       = config_main['duration']
-    inter     = dur / n_threads
+    rate      = config_main['sampling_rate']
     st_dt     = config_main['start_time_dt']
 
-    # Create a list of start times for each chunk.
-    chunk_starts = [st_dt + timedelta(seconds=i * inter) for i in range(n_threads)]
+    # The timeline is split in whole samples: chunk i holds the samples
+    # [row_bounds[i], row_bounds[i + 1]), so the chunks add up to the
+    # int(dur * rate) samples of the run with neither overlaps nor gaps.
+    total_samples = int(dur * rate)
+    n_chunks   = max(1, min(n_chunks, total_samples))
+    row_bounds = np.arange(n_chunks + 1, dtype=np.int64) * total_samples // n_chunks
+
+    # Chunk boundaries as one datetime64 array, at the timestamp of their first sample
+    # (offset from the run start and rounded to microseconds like the timestamps).
+    chunk_bounds = np.datetime64(st_dt, 'us') + \
+        np.rint(row_bounds * (1e6 / rate)).astype(np.int64).astype('timedelta64[us]')
 
     # Generate degradation events.
     all_degr = generate_degradation_events(config_main)
 
     # Distribute degradation events among chunks.
-    chunked = assign_degradations_to_chunks(all_degr, chunk_starts, inter)
+    chunked = assign_degradations_to_chunks(all_degr, chunk_bounds)
 
-    module_name = config_main['module_name'].replace(' ', '_')
+    module_name = config_main['module_name_safe']
 
     total_rows  = 0
     total_logs  = 0
-    applied_all = []
+    applied_blobs = []
+    row_ranges    = []
 
     phrases1 = ['']
     phrases2 = ['']
 
+    # Chunk i owns the rows [row_bounds[i], row_bounds[i + 1]) of the shared result arrays.
+    names          = list(config_main['parameters'])
+    total_capacity = total_samples
+    vals_dtype     = value_dtype(config_main['parameters'], config_main.get('decimal_places', 2))
+
+    # The config, parameters and phrases reach the workers once through the initializer,
+    # so the tasks carry only their chunk-specific arguments.
+    task_config = {k: v for k, v in config_main.items() if k != 'parameters'}
+
+    tasks = [(st_dt, int(row_bounds[i + 1] - row_bounds[i]), chunked[i],
+              i,  # seed
+              i,  # chunk_index
+              int(row_bounds[i]))
+             for i in range(n_chunks)]
+    # Tasks handed to a worker at a time; small enough to keep the tail balanced.
+    chunksize = config_main.get('chunksize') or max(1, len(tasks) // (n_threads * 4))
+    batches = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+
+    # With the fork start method (where available) the initializer arguments are
+    # inherited by the workers instead of being pickled to each of them.
+    if 'fork' in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context('fork')
+    else:
+        mp_context = multiprocessing.get_context()
+
+    # The chunk logs are merged by a writer thread while the pool is still running.
+    final_logs_filename = f"{module_name}_events.log"
+    log_queue = queue.Queue()
+    buffer_bytes = config_main.get('output_buffer_bytes', OUTPUT_BUFFER_BYTES)
+    direct_io    = config_main.get('use_direct_io', False)
+    merger = threading.Thread(target=merge_chunk_logs,
+                              args=(log_queue, final_logs_filename, buffer_bytes, direct_io))
+
+    # Result arrays too large for the free space of /dev/shm are backed by files in
+    # the output directory instead.
+    result_nbytes = total_capacity * (len(names) * np.dtype(vals_dtype).itemsize
+                                      + np.dtype(np.int64).itemsize)
+    if shared_memory_fits(result_nbytes):
+        vals_path = ts_path = None
+    else:
+        vals_path = f"{module_name}_values.tmp"
+        ts_path   = f"{module_name}_timestamps.tmp"
+        print(f"[{datetime.now()}] {result_nbytes / 2**20:.0f} MiB of results do not fit "
+              f"in /dev/shm; using {vals_path} and {ts_path}")
+
+    # Every shared block and result file is released in the finally below, also when
+    # a later allocation or the generation fails.
+    releases = []
+    values = timestamps = None
+
     par_start = log_start("parallel_generation")
-    with ProcessPoolExecutor(max_workers=n_threads) as execs:
-        futures = []
-        for i in range(n_threads):
-            fut = execs.submit(
-                generate_data_for_interval,
-                chunk_starts[i],
-                inter,
-                config_main,
-                chunked[i],
-                i,  # seed
-                i,  # chunk_index
-                phrases1,
-                phrases2
-            )
-            futures.append(fut)
-
-        for f in as_completed(futures):
-            res = f.result()
-            if res['error']:
-                print(f"Error: {res['error']}")
-                continue
-            total_rows += res['rows_count']
-            total_logs += res['logs_count']
-            applied_all.extend(res['applied_events'])
-            print(f"[{datetime.now()}] chunk => Rows {res['rows_count']}  "
-                  f"Logs {res['logs_count']}  Applied {len(res['applied_events'])}")
-
-    log_end("parallel_generation", par_start)
-
-    # Remove duplicate degradation events.
-    unique_evs = []
-    seen = set()
-    for e in applied_all:
-        e_id = (e['parameter'], e['start_time'], e['end_time'],
-                e['degradation_percent'], e['degradation_type'])
-        if e_id not in seen:
-            seen.add(e_id)
-            unique_evs.append(e)
-
-    # Combine all generated files.
-    fdata, flogs = combine_files(n_threads, module_name)
+    try:
+        shm, shm_args = share_parameters(config_main['parameters'])
+        releases.append(functools.partial(release_shared_memory, shm))
+        values, vals_args, release = create_result_array((total_capacity, len(names)),
+                                                         vals_dtype, vals_path)
+        releases.append(release)
+        timestamps, ts_args, release = create_result_array((total_capacity,), np.int64, ts_path)
+        releases.append(release)
+        result_args = (vals_args, ts_args)
+
+        # A worker that dies (out of memory, a signal, a failing initializer) breaks the
+        # executor, and result() raises BrokenProcessPool instead of waiting forever.
+        with ProcessPoolExecutor(max_workers=n_threads,
+                                 mp_context=mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(task_config, shm_args, phrases1, phrases2, result_args,
+                                           numba_threads_per_worker(n_threads))) as pool:
+            futures = [pool.submit(_worker, batch) for batch in batches]
+            # Started once the workers are forked, so no thread is running at fork time.
+            merger.start()
+
+            # Results stream back as batches complete.
+            for fut in as_completed(futures):
+                for res in fut.result():
+                    log_queue.put((res['chunk_index'], res['logs_file']))
+                    if res['error']:
+                        print(f"Error: {res['error']}")
+                        continue
+                    total_rows += res['rows_count']
+                    total_logs += res['logs_count']
+                    applied_blobs.append(res['applied_bytes'])
+                    row_ranges.append((res['row_offset'], res['row_offset'] + res['rows_count']))
+                    print(f"[{datetime.now()}] chunk => Rows {res['rows_count']}  "
+                          f"Logs {res['logs_count']}  Applied {res['applied_count']}")
+
+        log_end("parallel_generation", par_start)
+
+        # Write the data once from the shared buffer.
+        fdata, fcsv = save_data(module_name, names, timestamps, values, row_ranges,
+                                buffer_bytes=buffer_bytes, direct_io=direct_io)
+    finally:
+        # Lets the writer thread finish, also when generation failed.
+        if merger.is_alive():
+            log_queue.put(None)
+            merger.join()
+        values = timestamps = None
+        for release in releases:
+            release()
+
+    # Remove duplicate degradation events (the dict keeps first-seen order).
+    applied_all = decode_events(applied_blobs)
+    unique_evs = list({(e['parameter'], e['start_time'], e['end_time'],
+                        e['degradation_percent'], e['degradation_type']): e
+                       for e in applied_all}.values())
 
     # Generate the final simulation report.
     generate_result_report(
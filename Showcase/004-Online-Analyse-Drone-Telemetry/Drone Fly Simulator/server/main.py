@@ -18,58 +18,79 @@ HTTP requests for the main page and WebSocket events for updating flight paramet
 
 import eventlet
 eventlet.monkey_patch()
+from eventlet.queue import Queue, Empty, Full
 
 from flask import Flask, render_template
 from flask_socketio import SocketIO
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from datetime import datetime
-import json
+import itertools
+import logging
+import orjson
+import re
 import uuid
 
 # URL of the external server to forward flight data (ensure it matches the new module)
 TARGET_URL = "http://10.46.35.108:5000/post_handler/process_post"
+HEADERS = {"Content-Type": "application/json"}
+
+# One HTTP session for all forwarded requests, so keep-alive reuses the connection
+# instead of opening a new one per flight event.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+
+# Request ids: one random prefix per server process plus a counter, instead of
+# a fresh uuid4 (an os.urandom call) per forwarded request.
+_PID_UUID = uuid.uuid4().hex[:12]
+_COUNTER = itertools.count()
+
+# Per-event messages are logged at DEBUG level (off by default); a summary of the
+# forwarding counters is logged every STATS_INTERVAL seconds instead.
+log = logging.getLogger("drone")
+log.setLevel(logging.INFO)
+STATS_INTERVAL = 1.0
+_stats = {'events': 0, 'requests': 0, 'errors': 0, 'dropped': 0}
+
+# Attribute-string fields of a flight event that are parsed into separate fields.
+ATTRIBUTE_TEXT_FIELDS = ('movement_text', 'dynamics_text')
+
+# Flight events are forwarded in batches of up to FORWARD_BATCH_SIZE events,
+# collected while they keep arriving within FORWARD_BATCH_WAIT seconds.
+FORWARD_BATCH_SIZE = 64
+FORWARD_BATCH_WAIT = 0.05
+# At most FORWARD_QUEUE_SIZE events wait for forwarding; newer events are dropped
+# (and counted) while the target server cannot keep up.
+FORWARD_QUEUE_SIZE = 10000
 
 app = Flask(__name__, template_folder="../client/templates", static_folder="../client/static")
 app.config['SECRET_KEY'] = 'secret!'
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
 
+# Flight events waiting to be forwarded by the background forwarder.
+forward_queue = Queue(maxsize=FORWARD_QUEUE_SIZE)
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
+# One 'key=value' or 'key: value' pair of an attribute string, surrounding whitespace excluded.
+_ATTR_RE = re.compile(r'\s*([^=:,\s][^=:,]*?)\s*[=:]\s*([^,]*?)\s*(?:,|$)')
+
 def parse_attributes(text):
     """
     Parses a string of attributes in the format 'key=value, key2=value2'
     and returns a dictionary of the parsed pairs.
+    Empty pairs and pairs without '=' or ':' are skipped.
     """
-    result = {}
-    for pair in text.split(','):
-        pair = pair.strip()
-        if not pair:
-            continue
-        if '=' in pair:
-            key, value = pair.split('=', 1)
-        elif ':' in pair:
-            key, value = pair.split(':', 1)
-        else:
-            continue
-        result[key.strip()] = value.strip()
-    return result
+    # finditer feeds the matches straight into the dict, without an intermediate list.
+    return {m[1]: m[2] for m in _ATTR_RE.finditer(text)}
 
-def forward_flight_data(data):
+def normalize_flight_data(data):
     """
-    Forms a payload with additional fields and sends the flight data to an external server.
-    The new payload includes:
-      - nickname: sender identifier,
-      - req_id: unique request identifier,
-      - is_relative: calculation flag,
-      - cnt_calc_request: number of requests for calculation,
-      - cnt_grafana_cache: number of lines for Grafana data caching,
-      - transform_mode: processing mode for numerical transformation,
-      - data: the flight data as a JSON object.
-
-    Additionally, if 'movement_text' or 'dynamics_text' are provided as strings,
+    Returns the flight data as a JSON object (dictionary), or None if it is not one.
+    If 'movement_text' or 'dynamics_text' are provided as strings,
     they are parsed into dictionaries with key-value pairs.
     """
     # If data is a list with exactly one element that is a dictionary, use that element
@@ -80,55 +101,147 @@ def forward_flight_data(data):
             if data and isinstance(data[0], dict):
                 data_obj = data[0]
             else:
-                print("❌ Error: Data must be a JSON object (dictionary)")
-                return
+                log.warning("❌ Error: Data must be a JSON object (dictionary)")
+                return None
     elif isinstance(data, dict):
         data_obj = data
     else:
-        print("❌ Error: Data must be a JSON object (dictionary)")
-        return
-
-    # Convert movement_text and dynamics_text from strings to dictionaries if needed.
-    for key in ['movement_text', 'dynamics_text']:
-        if key in data_obj and isinstance(data_obj[key], str):
-            parsed = parse_attributes(data_obj[key])
-            # Remove the original field and merge parsed attributes into the object.
+        log.warning("❌ Error: Data must be a JSON object (dictionary)")
+        return None
+
+    # Convert movement_text and dynamics_text from strings to dictionaries if needed:
+    # a string field is removed and its parsed attributes are merged into the object;
+    # any other value (null included) stays unchanged in its place.
+    for key in ATTRIBUTE_TEXT_FIELDS:
+        value = data_obj.get(key)
+        if isinstance(value, str):
             del data_obj[key]
-            data_obj.update(parsed)
+            data_obj.update(parse_attributes(value))
+    return data_obj
+
+def serializable_events(data_objs):
+    """
+    Returns the flight events that orjson can serialize, in order. The others (for
+    example with a binary attachment) are logged and skipped, so that one bad event
+    does not take the rest of its batch down with it.
+    """
+    events = []
+    for obj in data_objs:
+        try:
+            orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+        except orjson.JSONEncodeError as e:
+            log.warning("❌ Flight event is not serializable, skipped: %s", e)
+        else:
+            events.append(obj)
+    return events
 
+def forward_flight_data(data_objs):
+    """
+    Forms a payload with additional fields and sends a batch of flight data to an external server.
+    The new payload includes:
+      - nickname: sender identifier,
+      - req_id: unique request identifier,
+      - is_relative: calculation flag,
+      - cnt_calc_request: number of requests for calculation,
+      - cnt_grafana_cache: number of lines for Grafana data caching,
+      - transform_mode: processing mode for numerical transformation,
+      - data: the flight data as a list of JSON objects, in arrival order.
+    """
     payload = {
         "nickname": "DJIFlightRecord",
-        "req_id": f"req_{int(time.time())}_{uuid.uuid4()}",
+        "req_id": f"req_{int(time.time())}_{_PID_UUID}_{next(_COUNTER):x}",
         "is_relative": True,
         "cnt_calc_request": 500,      # e.g., consider the last 500 requests
         "cnt_grafana_cache": 5000,     # e.g., cache 5000 rows for Grafana
         "transform_mode": "default",   # Mode for number processing: 'default' or 'log_transform'
-        "data": data_obj
+        "data": data_objs
     }
-    headers = {"Content-Type": "application/json"}
     try:
-        response = requests.post(TARGET_URL, json=payload, headers=headers, timeout=10)
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"\n🕒 {current_time} - Forwarded flight data:")
-        print(f"🔹 nickname: {payload['nickname']}")
-        print(f"🔹 Request ID: {payload['req_id']}")
-        print(f"🔹 Data: {payload['data']}")
+        # orjson serializes the payload (including NumPy values) much faster than json.
+        try:
+            body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        except orjson.JSONEncodeError:
+            # Rare: drop only the events that cannot be serialized.
+            data_objs = payload['data'] = serializable_events(data_objs)
+            if not data_objs:
+                return
+            body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        response = SESSION.post(TARGET_URL, data=body, headers=HEADERS, timeout=10)
+        _stats['requests'] += 1
+        _stats['events'] += len(data_objs)
+        log.debug("Forwarded flight data: nickname=%s, Request ID=%s, Data=%s",
+                  payload['nickname'], payload['req_id'], payload['data'])
         if response.status_code == 200:
-            print("✅ Response from target server: OK")
+            log.debug("✅ Response from target server: OK")
         else:
-            print(f"❌ Error {response.status_code}: {response.text}")
+            _stats['errors'] += 1
+            log.warning("❌ Error %s: %s", response.status_code, response.text)
+    except orjson.JSONEncodeError as e:
+        _stats['errors'] += 1
+        log.warning("❌ Payload is not serializable: %s", e)
     except requests.exceptions.RequestException as e:
-        print(f"❌ Request error: {e}")
+        _stats['errors'] += 1
+        log.warning("❌ Request error: %s", e)
+
+def forwarder_loop(queue):
+    """
+    Background greenlet: takes flight events from the queue and forwards them in batches
+    of up to FORWARD_BATCH_SIZE, sending a batch as soon as no new event arrives within
+    FORWARD_BATCH_WAIT seconds. The Socket.IO handlers never wait on the HTTP round-trip.
+    An unexpected error loses only the batch being forwarded, not the greenlet.
+    """
+    while True:
+        batch = [queue.get()]
+        while len(batch) < FORWARD_BATCH_SIZE:
+            try:
+                batch.append(queue.get(timeout=FORWARD_BATCH_WAIT))
+            except Empty:
+                break
+        try:
+            data_objs = [obj for obj in map(normalize_flight_data, batch) if obj is not None]
+            if data_objs:
+                forward_flight_data(data_objs)
+        except Exception:
+            _stats['errors'] += 1
+            log.exception("❌ Failed to forward a batch of %d events", len(batch))
+
+def stats_loop():
+    """
+    Background greenlet: logs how many events and requests were forwarded (and how many
+    requests failed) during the last STATS_INTERVAL seconds, if there was any traffic,
+    and warns about the events dropped because the forward queue was full.
+    """
+    last = dict(_stats)
+    while True:
+        eventlet.sleep(STATS_INTERVAL)
+        current = dict(_stats)
+        if current != last:
+            log.info("Forwarded %d events in %d requests (%d failed), %d waiting",
+                     current['events'] - last['events'],
+                     current['requests'] - last['requests'],
+                     current['errors'] - last['errors'],
+                     forward_queue.qsize())
+            if current['dropped'] != last['dropped']:
+                log.warning("❌ Dropped %d events: forward queue full",
+                            current['dropped'] - last['dropped'])
+            last = current
+
+eventlet.spawn(forwarder_loop, forward_queue)
+eventlet.spawn(stats_loop)
 
 @socketio.on("update_parameters")
 def handle_update_params(data):
-    print(f"Parameters updated: {data}")
+    log.info("Parameters updated: %s", data)
 
 @socketio.on("flight_data")
 def handle_flight_data(data):
-    print("Flight Data Received:", data)
-    # Forward the received flight data to the external server
-    forward_flight_data(data)
+    log.debug("Flight Data Received: %s", data)
+    # Queue the received flight data for forwarding to the external server
+    try:
+        forward_queue.put_nowait(data)
+    except Full:
+        _stats['dropped'] += 1
 
 if __name__ == "__main__":
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
     socketio.run(app, debug=True)